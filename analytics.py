@@ -0,0 +1,193 @@
+# SmartCart - Analytics Engine
+# Purchase history held column-wise in a pandas DataFrame; reports are vectorized group-bys
+
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = ('cart_id', 'purchased_at', 'product_id', 'category_id', 'quantity', 'unit_price')
+
+BASKET_SIZE_BINS = [0, 1, 2, 3, 5, 10, 20, np.inf]
+BASKET_SIZE_LABELS = ['1', '2', '3', '4-5', '6-10', '11-20', '21+']
+
+
+def period_codes(moments, period):
+    # Consecutive integers per day (D), Monday-based week (W) or month (M)
+    if period == 'M':
+        return moments.to_numpy(dtype='datetime64[M]').astype(np.int64)
+    days = moments.to_numpy(dtype='datetime64[D]').astype(np.int64)
+    # 1970-01-01 was a Thursday; shifting by 3 days makes weeks start on Monday
+    return days if period == 'D' else (days + 3) // 7
+
+
+def item_frame(rows):
+    frame = pd.DataFrame.from_records(rows, columns=COLUMNS)
+    frame['purchased_at'] = pd.to_datetime(frame['purchased_at'], format='ISO8601')
+    frame['quantity'] = frame['quantity'].astype(np.int64)
+    frame['unit_price'] = frame['unit_price'].astype(np.float64).fillna(0.0)
+    frame['revenue'] = frame['quantity'] * frame['unit_price']
+    return frame
+
+
+class AnalyticsEngine:
+    # One row per purchased item. Reloaded when the purchase count changes, at most every
+    # refresh_interval seconds, in a background thread; readers keep the previous frame meanwhile.
+
+    def __init__(self, refresh_interval=60):
+        self.refresh_interval = refresh_interval
+        self.version = None
+        self.loaded_at = 0.0
+        self.load_seconds = 0.0
+        self.items = pd.DataFrame({name: [] for name in COLUMNS})
+        self.products = pd.DataFrame({'product_id': [], 'name': [], 'category_id': []})
+        self.categories = pd.DataFrame({'category_id': [], 'name': []})
+        self._lock = threading.Lock()
+
+    def is_stale(self, version):
+        if self.version is None:
+            return True
+        return version != self.version and time.time() - self.loaded_at >= self.refresh_interval
+
+    def refresh(self, version, load, background=True):
+        # load() -> (item row chunks, product rows, category rows). Only the first load blocks.
+        if not self.is_stale(version) or not self._lock.acquire(blocking=self.version is None):
+            return
+        if self.version is not None and background:
+            threading.Thread(target=self._reload, args=(version, load), daemon=True).start()
+            return
+        self._reload(version, load)
+
+    def _reload(self, version, load):
+        try:
+            if self.is_stale(version):
+                self.build(*load(), version=version)
+        finally:
+            self._lock.release()
+
+    def build(self, item_chunks, products, categories, version=None):
+        # item_chunks: iterable of lists of COLUMNS tuples, converted chunk by chunk
+        started = time.perf_counter()
+        frames = [item_frame(chunk) for chunk in item_chunks]
+        self.items = pd.concat(frames, ignore_index=True) if frames else item_frame([])
+        self.products = pd.DataFrame.from_records(list(products), columns=['product_id', 'name', 'category_id'])
+        self.categories = pd.DataFrame.from_records(list(categories), columns=['category_id', 'name'])
+        self.version = version
+        self.loaded_at = time.time()
+        self.load_seconds = time.perf_counter() - started
+
+    def window(self, start=None, end=None):
+        items = self.items
+        if start is not None:
+            items = items[items['purchased_at'] >= start]
+        if end is not None:
+            items = items[items['purchased_at'] < end]
+        return items
+
+    def summary(self, start=None, end=None, top=5):
+        items = self.window(start, end)
+        purchases = int(items['cart_id'].nunique())
+        revenue = float(items['revenue'].sum())
+        popular = items.groupby('product_id', sort=False)['quantity'].sum().nlargest(top)
+        names = self.products.set_index('product_id')['name']
+        return {
+            'total_purchases': purchases,
+            'total_spent': round(revenue, 2),
+            'average_per_purchase': round(revenue / purchases, 2) if purchases else 0,
+            'most_popular_products': [
+                {'name': names.get(product_id), 'count': int(count)} for product_id, count in popular.items()
+            ]
+        }
+
+    def revenue_by_category(self, start=None, end=None):
+        items = self.window(start, end)
+        grouped = items.groupby('category_id', sort=False).agg(
+            revenue=('revenue', 'sum'), quantity=('quantity', 'sum'), purchases=('cart_id', 'nunique')
+        )
+        total = grouped['revenue'].sum()
+        grouped = grouped.join(self.categories.set_index('category_id')).sort_values('revenue', ascending=False)
+        return [
+            {
+                'category_id': int(category_id),
+                'category': row['name'],
+                'revenue': round(float(row['revenue']), 2),
+                'quantity': int(row['quantity']),
+                'purchases': int(row['purchases']),
+                'share': round(float(row['revenue'] / total), 4) if total else 0
+            }
+            for category_id, row in grouped.iterrows()
+        ]
+
+    def basket_sizes(self, start=None, end=None):
+        items = self.window(start, end)
+        baskets = items.groupby('cart_id', sort=False).agg(
+            units=('quantity', 'sum'), products=('product_id', 'size'), value=('revenue', 'sum')
+        )
+        if baskets.empty:
+            return {'purchases': 0, 'distribution': [], 'units': {}, 'distinct_products': {}, 'value': {}}
+
+        counts = pd.cut(baskets['units'], BASKET_SIZE_BINS, labels=BASKET_SIZE_LABELS).value_counts(sort=False)
+        distribution = [
+            {'units': label, 'purchases': int(count), 'share': round(float(count / len(baskets)), 4)}
+            for label, count in counts.items()
+        ]
+
+        def describe(series):
+            return {
+                'mean': round(float(series.mean()), 2),
+                'p50': round(float(series.quantile(0.5)), 2),
+                'p90': round(float(series.quantile(0.9)), 2),
+                'max': round(float(series.max()), 2)
+            }
+
+        return {
+            'purchases': len(baskets),
+            'distribution': distribution,
+            'units': describe(baskets['units']),
+            'distinct_products': describe(baskets['products']),
+            'value': describe(baskets['value'])
+        }
+
+    def repeat_purchases(self, start=None, end=None, period='W', top=10):
+        # Carts carry no customer, so repeat purchasing is measured per product over time:
+        # the share of periods with a sale that are followed by a sale in the next period.
+        items = self.window(start, end)
+        if items.empty:
+            return {'period': period, 'repeat_rate': 0, 'products': []}
+
+        periods = period_codes(items['purchased_at'], period)
+        active = pd.DataFrame({'product_id': items['product_id'].to_numpy(), 'period': periods}).drop_duplicates()
+        active = active.sort_values(['product_id', 'period'])
+        codes = active['period'].to_numpy()
+        same_product = active['product_id'].to_numpy()[1:] == active['product_id'].to_numpy()[:-1]
+        repeated = np.zeros(len(active), dtype=bool)
+        repeated[:-1] = same_product & (codes[1:] - codes[:-1] == 1)
+        last_period = int(periods.max())
+        # The last observed period cannot be followed yet, so it doesn't count as an opportunity
+        eligible = codes < last_period
+
+        per_product = pd.DataFrame({
+            'product_id': active['product_id'].to_numpy(),
+            'repeated': repeated & eligible,
+            'eligible': eligible
+        }).groupby('product_id').sum()
+        per_product = per_product[per_product['eligible'] > 0]
+        per_product['rate'] = per_product['repeated'] / per_product['eligible']
+        per_product = per_product.join(self.products.set_index('product_id')['name'])
+        per_product = per_product.sort_values(['rate', 'eligible'], ascending=False).head(top)
+
+        opportunities = int(eligible.sum())
+        return {
+            'period': period,
+            'repeat_rate': round(float((repeated & eligible).sum() / opportunities), 4) if opportunities else 0,
+            'products': [
+                {
+                    'product_id': int(product_id),
+                    'name': row['name'],
+                    'active_periods': int(row['eligible']),
+                    'repeat_rate': round(float(row['rate']), 4)
+                }
+                for product_id, row in per_product.iterrows()
+            ]
+        }
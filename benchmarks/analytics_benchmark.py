@@ -0,0 +1,90 @@
+# SmartCart - Analytics Benchmark
+# Row-at-a-time ORM loops (how /api/stats used to work) against the columnar analytics engine.
+# usage: python benchmarks/analytics_benchmark.py [--items 1000000] [--products 2000]
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from datagen import generate
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def loop_stats(A):
+    # The original get_stats(): one query per cart, lazy product load per item
+    total_purchases = A.Cart.query.filter_by(is_purchased=True).count()
+    total_spent = 0
+    product_counts = {}
+    for cart in A.Cart.query.filter_by(is_purchased=True).all():
+        for item in A.CartItem.query.filter_by(cart_id=cart.id).all():
+            total_spent += item.product.price * item.quantity
+            product_counts[item.product.name] = product_counts.get(item.product.name, 0) + item.quantity
+    most_popular = sorted(product_counts.items(), key=lambda x: x[1], reverse=True)[:5]
+    return total_purchases, round(total_spent, 2), most_popular
+
+
+def loop_revenue_by_category(A):
+    revenue = {}
+    for cart in A.Cart.query.filter_by(is_purchased=True).all():
+        for item in A.CartItem.query.filter_by(cart_id=cart.id).all():
+            category = item.product.category.name
+            revenue[category] = revenue.get(category, 0) + item.unit_price * item.quantity
+    return revenue
+
+
+def timed(label, func, results):
+    started = time.perf_counter()
+    value = func()
+    results.append((label, time.perf_counter() - started))
+    print(f"{label:<42} {results[-1][1]:>9.3f} s", flush=True)
+    return value
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Loop-based stats vs the columnar analytics engine')
+    parser.add_argument('--items', type=int, default=1000000)
+    parser.add_argument('--products', type=int, default=2000)
+    parser.add_argument('--skip-loops', action='store_true', help='Only time the columnar engine.')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='smartcart-bench-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    sys.path.insert(0, ROOT)
+    import app as A
+
+    results = []
+    with A.app.app_context():
+        A.db.create_all()
+        A.run_migrations()
+        with A.db.engine.begin() as connection:
+            carts = timed('generate data', lambda: generate(connection, args.items, args.products), results)
+        print(f"{carts} purchased carts, {args.items} cart items, {args.products} products\n")
+        A.db.session.add(A.SalesTotals(id=1, purchases=carts, revenue=0))
+        A.db.session.commit()
+
+        engine = A.analytics
+        timed('columnar: load purchase history', lambda: engine.build(*A.load_analytics(), version=carts), results)
+        summary = timed('columnar: summary (get_stats equivalent)', engine.summary, results)
+        timed('columnar: revenue by category', engine.revenue_by_category, results)
+        timed('columnar: basket sizes', engine.basket_sizes, results)
+        timed('columnar: repeat purchases (weekly)', engine.repeat_purchases, results)
+
+        if not args.skip_loops:
+            baseline = timed('loop: get_stats', lambda: loop_stats(A), results)
+            A.db.session.expunge_all()
+            timed('loop: revenue by category', lambda: loop_revenue_by_category(A), results)
+            assert baseline[0] == summary['total_purchases']
+            assert abs(baseline[1] - summary['total_spent']) <= 0.01 + 1e-9 * baseline[1]
+
+    timings = dict(results)
+    if not args.skip_loops:
+        print(f"\nget_stats speed-up: {timings['loop: get_stats'] / timings['columnar: summary (get_stats equivalent)']:.0f}x "
+              f"per report, {timings['loop: get_stats'] / (timings['columnar: load purchase history'] + timings['columnar: summary (get_stats equivalent)']):.1f}x "
+              f"including the load")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+# SmartCart - Concurrency Check
+# Races writers against a running API and checks the results add up: concurrent adds to one cart
+# lose no quantity, and a cart purchased by several requests at once is sold exactly once.
+# usage: python benchmarks/concurrency_check.py [--url http://localhost:5000/api] [--threads 8] [--rounds 20]
+# Run it against an otherwise idle server (the stats totals are compared before and after); exit code 1 on failure.
+
+import argparse
+import random
+import sys
+import threading
+
+import requests
+
+
+def race(threads, action):
+    # Runs action(index) on `threads` threads released together by a barrier -> list of results
+    barrier = threading.Barrier(threads)
+    results = [None] * threads
+
+    def worker(index):
+        session = requests.Session()
+        barrier.wait()
+        results[index] = action(session, index)
+
+    workers = [threading.Thread(target=worker, args=(index,)) for index in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return results
+
+
+def product_ids(base_url, count):
+    response = requests.get(f'{base_url}/products', params={'fields': 'id', 'limit': 1000}, timeout=30)
+    ids = [product['id'] for product in response.json()]
+    if len(ids) < count:
+        sys.exit('The catalogue is too small; run `flask --app app init-db` or benchmarks/datagen.py first')
+    return ids
+
+
+def new_cart(base_url):
+    return requests.post(f'{base_url}/cart', timeout=30).json()['id']
+
+
+def check_adds(base_url, products, threads, rounds):
+    # Every thread adds one unit of the same two products per round, one through /add and one
+    # through /items:batch; both lines must end at threads * rounds
+    cart_id = new_cart(base_url)
+    first, second = products[:2]
+
+    def add(session, index):
+        failures = 0
+        for _ in range(rounds):
+            single = session.post(f'{base_url}/cart/{cart_id}/add', json={'product_id': first, 'quantity': 1},
+                                  timeout=30)
+            batch = session.post(f'{base_url}/cart/{cart_id}/items:batch', json={
+                'operations': [{'op': 'add', 'product_id': second, 'quantity': 1}]
+            }, timeout=30)
+            failures += (single.status_code != 200) + (batch.status_code != 200)
+        return failures
+
+    failures = sum(race(threads, add))
+    items = requests.get(f'{base_url}/cart/{cart_id}', timeout=30).json()['items']
+    quantities = sorted(item['quantity'] for item in items)
+    expected = [threads * rounds] * 2
+    problems = []
+    if failures:
+        problems.append(f"{failures} add requests failed")
+    if quantities != expected:
+        problems.append(f"cart {cart_id} quantities {quantities}, expected {expected}")
+    return problems
+
+
+def check_purchases(base_url, products, threads, rounds, rng):
+    # Each round fills a cart from a small pool of products (so the pair and per-product counters
+    # collide across rounds), then `threads` requests try to purchase it at the same moment
+    before = requests.get(f'{base_url}/stats', timeout=30).json()
+    pool = products[:6]
+    problems, expected_revenue = [], 0.0
+    for _ in range(rounds):
+        cart_id = new_cart(base_url)
+        requests.post(f'{base_url}/cart/{cart_id}/items:batch', json={'operations': [
+            {'op': 'add', 'product_id': product_id, 'quantity': rng.randint(1, 3)}
+            for product_id in rng.sample(pool, rng.randint(2, len(pool)))
+        ]}, timeout=30)
+        statuses = sorted(race(threads, lambda session, index: session.post(
+            f'{base_url}/cart/{cart_id}/purchase', timeout=30
+        ).status_code))
+        if statuses != [200] + [400] * (threads - 1):
+            problems.append(f"cart {cart_id} purchase statuses {statuses}")
+        expected_revenue += requests.get(f'{base_url}/cart/{cart_id}', timeout=30).json()['total']
+
+    after = requests.get(f'{base_url}/stats', timeout=30).json()
+    purchases = after['total_purchases'] - before['total_purchases']
+    revenue = after['total_spent'] - before['total_spent']
+    if purchases != rounds:
+        problems.append(f"total_purchases grew by {purchases}, expected {rounds}")
+    if abs(revenue - expected_revenue) > 0.01 * rounds:
+        problems.append(f"total_spent grew by {revenue:.2f}, expected {expected_revenue:.2f}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Concurrent write checks for the SmartCart API')
+    parser.add_argument('--url', default='http://localhost:5000/api')
+    parser.add_argument('--threads', type=int, default=8, help='Requests racing each other.')
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    base_url = args.url.rstrip('/')
+    rng = random.Random(args.seed)
+    products = product_ids(base_url, 6)
+    rng.shuffle(products)
+
+    failed = False
+    for name, check in [
+        ('concurrent adds', lambda: check_adds(base_url, products, args.threads, args.rounds)),
+        ('concurrent purchases', lambda: check_purchases(base_url, products, args.threads, args.rounds, rng))
+    ]:
+        problems = check()
+        print(f"{name:<24} {'FAIL' if problems else 'ok'}")
+        for problem in problems:
+            print(f"  {problem}")
+        failed = failed or bool(problems)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+# SmartCart - Benchmark Data Generator
+# Scales the sample data of init_database() up to a catalogue and purchase history of any size.
+# usage: python benchmarks/datagen.py --database sqlite:////tmp/bench.db [--products 100000] [--items 10000000]
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import table, column, text
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CATEGORIES = ['Dairy', 'Fruits', 'Vegetables', 'Meat', 'Fish', 'Bakery', 'Beverages', 'Snacks']
+
+# Words of the sample catalogue, so searches from the load test hit realistic numbers of products
+NOUNS = [
+    'Milk', 'Yogurt', 'Cheese', 'Butter', 'Apples', 'Bananas', 'Oranges', 'Strawberries', 'Tomatoes',
+    'Cucumbers', 'Onions', 'Potatoes', 'Chicken', 'Beef', 'Pork', 'Salmon', 'Bass', 'Cod', 'Bread',
+    'Croissants', 'Baguette', 'Water', 'Juice', 'Coffee', 'Chips', 'Chocolate', 'Cookies'
+]
+ADJECTIVES = ['Fresh', 'Greek', 'Organic', 'Premium', 'Sweet', 'Crispy', 'Traditional', 'Red', 'Whole', 'Light']
+
+CHUNK_CARTS = 20000
+
+
+def generate(connection, items, products, categories=8, seed=42, chunk_carts=CHUNK_CARTS):
+    # Carts of 1-9 distinct products, purchased over the last year; written in chunks so
+    # memory stays flat at 10M items. Returns the number of purchased carts.
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    category_table = table('category', column('id'), column('name'))
+    product_table = table('product', column('id'), column('name'), column('description'),
+                          column('price'), column('category_id'))
+    cart_table = table('cart', column('id'), column('created_at'), column('purchased_at'),
+                       column('is_purchased'), column('total'), column('item_count'))
+    item_table = table('cart_item', column('cart_id'), column('product_id'), column('quantity'),
+                       column('unit_price'), column('product_name'))
+
+    category_names = CATEGORIES + [f"Category {n}" for n in range(len(CATEGORIES) + 1, categories + 1)]
+    connection.execute(category_table.insert(), [
+        {'id': category_id, 'name': category_names[category_id - 1]} for category_id in range(1, categories + 1)
+    ])
+
+    prices, names = {}, {}
+    rows = []
+    for product_id in range(1, products + 1):
+        adjective, noun = rng.choice(ADJECTIVES), rng.choice(NOUNS)
+        prices[product_id] = round(rng.uniform(0.5, 20), 2)
+        names[product_id] = f"{adjective} {noun} {product_id}"
+        rows.append({
+            'id': product_id,
+            'name': names[product_id],
+            'description': f"{adjective} {noun.lower()}",
+            'price': prices[product_id],
+            'category_id': rng.randint(1, categories)
+        })
+        if len(rows) == 10000 or product_id == products:
+            connection.execute(product_table.insert(), rows)
+            rows = []
+
+    carts, cart_items = [], []
+    cart_id = written = 0
+    while written < items:
+        cart_id += 1
+        purchased_at = now - timedelta(seconds=rng.randint(0, 365 * 86400))
+        chosen = rng.sample(range(1, products + 1), min(rng.randint(1, 9), items - written, products))
+        lines = [
+            {'cart_id': cart_id, 'product_id': product_id, 'quantity': rng.randint(1, 3),
+             'unit_price': prices[product_id], 'product_name': names[product_id]}
+            for product_id in chosen
+        ]
+        written += len(lines)
+        cart_items += lines
+        carts.append({
+            'id': cart_id, 'created_at': purchased_at, 'purchased_at': purchased_at, 'is_purchased': True,
+            'total': sum(line['quantity'] * line['unit_price'] for line in lines),
+            'item_count': sum(line['quantity'] for line in lines)
+        })
+        if len(carts) == chunk_carts or written >= items:
+            connection.execute(cart_table.insert(), carts)
+            connection.execute(item_table.insert(), cart_items)
+            carts, cart_items = [], []
+
+    if connection.dialect.name == 'postgresql':
+        # Explicit ids do not advance the serial sequences; move them past the generated rows so
+        # the next POST /api/cart (or new product) does not collide with them
+        for name in ('category', 'product', 'cart'):
+            connection.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{name}', 'id'), (SELECT max(id) FROM {name}))"
+            ))
+    return cart_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fill an empty SmartCart database with synthetic data')
+    parser.add_argument('--database', required=True, help='SQLAlchemy URI of an empty database.')
+    parser.add_argument('--products', type=int, default=10000)
+    parser.add_argument('--items', type=int, default=1000000, help='Purchased cart items.')
+    parser.add_argument('--categories', type=int, default=len(CATEGORIES))
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = args.database
+    sys.path.insert(0, ROOT)
+    import app as A
+
+    def step(label, func):
+        started = time.perf_counter()
+        value = func()
+        print(f"{label:<32} {time.perf_counter() - started:>9.1f} s", flush=True)
+        return value
+
+    with A.app.app_context():
+        A.db.create_all()
+        A.run_migrations()
+        if A.Category.query.first():
+            sys.exit('Database already has data; datagen needs an empty database')
+
+        with A.db.engine.begin() as connection:
+            carts = step('generate data', lambda: generate(
+                connection, args.items, args.products, args.categories, args.seed
+            ))
+        # Bulk inserts bypass the ORM hooks, so the derived tables are rebuilt from scratch
+        step('search index', A.ensure_search_index)
+        step('aggregates and rollups', A.rebuild_aggregates)
+    print(f"{args.products} products, {carts} purchased carts, {args.items} cart items")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,304 @@
+# SmartCart - Load Test
+# Virtual users run a weighted mix of shopper scenarios against a running API and the
+# latency, throughput and SQL statements per request are reported per endpoint.
+# usage: python benchmarks/load_test.py [--url http://localhost:5000/api] [--users 16] [--duration 60]
+#        [--baseline benchmarks/baseline.json [--save-baseline]]
+# Start the server with QUERY_COUNT_HEADER=1 to get query counts (X-Query-Count).
+
+import argparse
+import json
+import platform
+import random
+import sys
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+import requests
+
+SEARCH_TERMS = ['milk', 'cheese', 'fresh', 'organic', 'bread', 'chicken', 'coffee', 'chocolate', 'greek', 'juice']
+
+DEFAULT_MIX = {'browse': 35, 'search': 20, 'add': 20, 'purchase': 5, 'stats': 10, 'recommendations': 10}
+
+# Flagged against the baseline: p50 and p95 both slower by more than the tolerance (and p95 by at
+# least MIN_DELTA_MS), more SQL statements per request, more errors or a lower overall throughput.
+# Requiring both percentiles keeps a noisy tail on its own from failing the run.
+MIN_DELTA_MS = 5.0
+
+
+class Recorder:
+
+    def __init__(self):
+        self.samples = {}
+        self.recording = False
+        self._lock = threading.Lock()
+
+    def add(self, name, seconds, ok, queries):
+        if not self.recording:
+            return
+        with self._lock:
+            sample = self.samples.setdefault(name, {'latency': [], 'errors': 0, 'queries': []})
+            sample['latency'].append(seconds)
+            sample['errors'] += not ok
+            if queries is not None:
+                sample['queries'].append(queries)
+
+
+class Client:
+    # One pooled session per virtual user; requests are recorded under their route template
+
+    def __init__(self, base_url, recorder):
+        self.base_url = base_url.rstrip('/')
+        self.recorder = recorder
+        self.session = requests.Session()
+
+    def call(self, name, method, path, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, self.base_url + path, timeout=30, **kwargs)
+        except requests.RequestException:
+            self.recorder.add(name, time.perf_counter() - started, False, None)
+            return None
+        elapsed = time.perf_counter() - started
+        queries = response.headers.get('X-Query-Count')
+        self.recorder.add(name, elapsed, response.status_code < 400, int(queries) if queries is not None else None)
+        return response if response.status_code < 400 else None
+
+
+class Shopper:
+
+    def __init__(self, client, catalogue, rng):
+        self.client = client
+        self.catalogue = catalogue
+        self.rng = rng
+        self.cart_id = None
+        self.cart_lines = 0
+
+    def product_id(self):
+        return self.rng.choice(self.catalogue['product_ids'])
+
+    def new_cart(self):
+        response = self.client.call('POST /api/cart', 'POST', '/cart')
+        return response.json()['id'] if response else None
+
+    def browse(self):
+        self.client.call('GET /api/categories', 'GET', '/categories')
+        category_id = self.rng.choice(self.catalogue['category_ids'])
+        self.client.call('GET /api/products?category_id', 'GET', '/products', params={
+            'category_id': category_id, 'limit': 24, 'cursor': 24 * self.rng.randint(0, 4),
+            'sort_by': self.rng.choice(['name', 'price'])
+        })
+
+    def search(self):
+        self.client.call('GET /api/products?search', 'GET', '/products', params={
+            'search': self.rng.choice(SEARCH_TERMS), 'limit': 24
+        })
+
+    def add(self):
+        if self.cart_id is None or self.cart_lines >= 20:
+            self.cart_id, self.cart_lines = self.new_cart(), 0
+            if self.cart_id is None:
+                return
+        self.client.call('POST /api/cart/<id>/add', 'POST', f'/cart/{self.cart_id}/add', json={
+            'product_id': self.product_id(), 'quantity': self.rng.randint(1, 3)
+        })
+        self.cart_lines += 1
+        self.client.call('GET /api/cart/<id>/summary', 'GET', f'/cart/{self.cart_id}/summary')
+
+    def purchase(self):
+        cart_id = self.new_cart()
+        if cart_id is None:
+            return
+        product_ids = self.catalogue['product_ids']
+        operations = [
+            {'op': 'add', 'product_id': product_id, 'quantity': self.rng.randint(1, 3)}
+            for product_id in self.rng.sample(product_ids, min(self.rng.randint(2, 8), len(product_ids)))
+        ]
+        self.client.call('POST /api/cart/<id>/items:batch', 'POST', f'/cart/{cart_id}/items:batch', json={
+            'operations': operations
+        })
+        self.client.call('GET /api/cart/<id>', 'GET', f'/cart/{cart_id}')
+        self.client.call('POST /api/cart/<id>/purchase', 'POST', f'/cart/{cart_id}/purchase')
+
+    def stats(self):
+        self.client.call('GET /api/stats', 'GET', '/stats')
+        self.client.call('GET /api/stats/timeseries', 'GET', '/stats/timeseries', params={'granularity': 'day'})
+        self.client.call('GET /api/analytics/summary', 'GET', '/analytics/summary')
+
+    def recommendations(self):
+        params = {'cart_id': self.cart_id} if self.cart_id else {}
+        self.client.call('GET /api/recommend-cart', 'GET', '/recommend-cart', params=params)
+        self.client.call('GET /api/frequently-bought-together/<id>', 'GET',
+                         f'/frequently-bought-together/{self.product_id()}')
+
+
+def load_catalogue(base_url):
+    # Product and category ids to draw from, paged through /api/products like the UI does
+    session = requests.Session()
+    categories = session.get(f'{base_url}/categories', timeout=30).json()
+    product_ids, cursor = [], None
+    while True:
+        params = {'fields': 'id', 'limit': 1000}
+        if cursor:
+            params['cursor'] = cursor
+        response = session.get(f'{base_url}/products', params=params, timeout=60)
+        product_ids += [product['id'] for product in response.json()]
+        cursor = response.headers.get('X-Next-Cursor')
+        if not cursor:
+            break
+    if not product_ids or not categories:
+        sys.exit('The catalogue is empty; run `flask --app app init-db` or benchmarks/datagen.py first')
+    return {'product_ids': product_ids, 'category_ids': [category['id'] for category in categories]}
+
+
+def parse_mix(text):
+    # "browse=35,search=20" -> {'browse': 35, 'search': 20}
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        if name not in DEFAULT_MIX or not weight.isdigit():
+            raise argparse.ArgumentTypeError(f"Invalid scenario weight: {part}")
+        mix[name] = int(weight)
+    return mix
+
+
+def run(base_url, users, duration, warmup, mix, seed):
+    catalogue = load_catalogue(base_url)
+    recorder = Recorder()
+    deadline = time.monotonic() + warmup + duration
+    names, weights = list(mix), list(mix.values())
+    scenario_counts = {name: 0 for name in names}
+    counts_lock = threading.Lock()
+
+    def user(index):
+        rng = random.Random(seed + index)
+        shopper = Shopper(Client(base_url, recorder), catalogue, rng)
+        while time.monotonic() < deadline:
+            name = rng.choices(names, weights)[0]
+            getattr(shopper, name)()
+            if recorder.recording:
+                with counts_lock:
+                    scenario_counts[name] += 1
+
+    threads = [threading.Thread(target=user, args=(index,), daemon=True) for index in range(users)]
+    for thread in threads:
+        thread.start()
+    time.sleep(warmup)
+    recorder.recording = True
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    recorder.recording = False
+    elapsed = time.perf_counter() - started
+    return summarize(recorder.samples, elapsed, scenario_counts, catalogue)
+
+
+def summarize(samples, elapsed, scenario_counts, catalogue):
+    endpoints = {}
+    for name, sample in sorted(samples.items()):
+        latency = np.array(sample['latency']) * 1000
+        p50, p95, p99 = np.percentile(latency, [50, 95, 99])
+        endpoints[name] = {
+            'requests': len(latency),
+            'errors': sample['errors'],
+            'throughput': round(len(latency) / elapsed, 2),
+            'mean_ms': round(float(latency.mean()), 2),
+            'p50_ms': round(float(p50), 2),
+            'p95_ms': round(float(p95), 2),
+            'p99_ms': round(float(p99), 2),
+            'queries_mean': round(float(np.mean(sample['queries'])), 2) if sample['queries'] else None,
+            'queries_max': int(max(sample['queries'])) if sample['queries'] else None
+        }
+    total = sum(endpoint['requests'] for endpoint in endpoints.values())
+    return {
+        'elapsed': round(elapsed, 2),
+        'requests': total,
+        'errors': sum(endpoint['errors'] for endpoint in endpoints.values()),
+        'throughput': round(total / elapsed, 2) if elapsed else 0,
+        'scenarios': scenario_counts,
+        'endpoints': endpoints,
+        'dataset': {'products': len(catalogue['product_ids']), 'categories': len(catalogue['category_ids'])}
+    }
+
+
+def compare(results, baseline, tolerance):
+    # -> list of regression messages
+    regressions = []
+    for name, endpoint in results['endpoints'].items():
+        base = baseline['endpoints'].get(name)
+        if not base:
+            continue
+        if endpoint['p50_ms'] > base['p50_ms'] * (1 + tolerance) and endpoint['p95_ms'] > base['p95_ms'] * (1 + tolerance) \
+                and endpoint['p95_ms'] - base['p95_ms'] >= MIN_DELTA_MS:
+            regressions.append(f"{name}: p50 {base['p50_ms']:.1f} -> {endpoint['p50_ms']:.1f} ms, "
+                               f"p95 {base['p95_ms']:.1f} -> {endpoint['p95_ms']:.1f} ms")
+        if endpoint['queries_mean'] is not None and base['queries_mean'] is not None \
+                and endpoint['queries_mean'] > base['queries_mean'] + 0.5:
+            regressions.append(f"{name}: queries/request {base['queries_mean']} -> {endpoint['queries_mean']}")
+        if endpoint['errors'] / endpoint['requests'] > base['errors'] / base['requests'] + 0.01:
+            regressions.append(f"{name}: errors {base['errors']}/{base['requests']} -> "
+                               f"{endpoint['errors']}/{endpoint['requests']}")
+    if results['throughput'] < baseline['throughput'] * (1 - tolerance):
+        regressions.append(f"throughput {baseline['throughput']:.1f} -> {results['throughput']:.1f} req/s")
+    return regressions
+
+
+def print_report(results):
+    print(f"{'endpoint':<42} {'reqs':>7} {'err':>5} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'queries':>8}")
+    for name, endpoint in results['endpoints'].items():
+        queries = '-' if endpoint['queries_mean'] is None else f"{endpoint['queries_mean']:.1f}"
+        print(f"{name:<42} {endpoint['requests']:>7} {endpoint['errors']:>5} {endpoint['throughput']:>8.1f} "
+              f"{endpoint['p50_ms']:>8.1f} {endpoint['p95_ms']:>8.1f} {endpoint['p99_ms']:>8.1f} {queries:>8}")
+    print(f"\n{results['requests']} requests in {results['elapsed']:.1f} s, {results['throughput']:.1f} req/s, "
+          f"{results['errors']} errors; latencies in ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Scenario-mix load test for the SmartCart API')
+    parser.add_argument('--url', default='http://localhost:5000/api')
+    parser.add_argument('--users', type=int, default=16, help='Concurrent virtual users.')
+    parser.add_argument('--duration', type=float, default=60, help='Measured seconds.')
+    parser.add_argument('--warmup', type=float, default=5, help='Seconds run before measuring.')
+    parser.add_argument('--mix', type=parse_mix, default=DEFAULT_MIX,
+                        help='Scenario weights, e.g. browse=35,search=20,add=20,purchase=5,stats=10,recommendations=10')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Write the results as JSON.')
+    parser.add_argument('--baseline', help='Baseline JSON to compare against; exit code 1 on regressions.')
+    parser.add_argument('--save-baseline', action='store_true', help='Store this run as the --baseline file.')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed relative slowdown.')
+    args = parser.parse_args()
+
+    results = run(args.url, args.users, args.duration, args.warmup, args.mix, args.seed)
+    results['run'] = {
+        'date': datetime.utcnow().isoformat(timespec='seconds'),
+        'users': args.users,
+        'duration': args.duration,
+        'mix': args.mix,
+        'machine': f"{platform.machine()} {platform.system()} python {platform.python_version()}"
+    }
+    print_report(results)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            json.dump(results, handle, indent=2)
+
+    if args.baseline and args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as handle:
+            json.dump(results, handle, indent=2)
+        print(f"Baseline stored in {args.baseline}")
+    elif args.baseline:
+        with open(args.baseline, encoding='utf-8') as handle:
+            baseline = json.load(handle)
+        if baseline['dataset'] != results['dataset'] or baseline['run']['users'] != args.users:
+            print("Warning: dataset or user count differs from the baseline run")
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against the baseline")
+
+
+if __name__ == '__main__':
+    main()
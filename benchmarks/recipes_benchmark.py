@@ -0,0 +1,112 @@
+# SmartCart - Recipe Benchmark
+# Synthetic recipe collections of any size for the recipe index, and suggestion latency on carts
+# named like the datagen catalogue; the index is checked against a plain scan over every recipe.
+# usage: python benchmarks/recipes_benchmark.py [--recipes 10000] [--queries 1000] [--output /tmp/recipes.json]
+# The --output file can be served with RECIPES_FILE=/tmp/recipes.json.
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+from datagen import ADJECTIVES, NOUNS
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from recipes import RecipeIndex, normalize_tokens  # noqa: E402
+
+STYLES = ['Baked', 'Grilled', 'Roasted', 'Stuffed', 'Braised', 'Spicy', 'Creamy', 'Country', 'Island', 'Summer']
+DISHES = ['Salad', 'Stew', 'Pie', 'Soup', 'Bowl', 'Skillet', 'Wrap', 'Tart', 'Casserole', 'Platter']
+
+
+def generate_recipes(count, seed=42):
+    # Ingredients are drawn from the sample recipes, the catalogue nouns and a long tail of rare ones,
+    # so postings lists range from thousands of recipes down to a handful
+    rng = random.Random(seed)
+    with open(os.path.join(ROOT, 'recipes.json'), encoding='utf-8') as handle:
+        sample = json.load(handle)
+    common = sorted({ingredient for recipe in sample for ingredient in recipe['ingredients']} |
+                    {noun.lower() for noun in NOUNS})
+    rare = [f"{rng.choice(ADJECTIVES).lower()} {rng.choice(common)} {letter}{number}"
+            for letter in 'abcdefgh' for number in range(250)]
+
+    recipes = []
+    for recipe_id in range(count):
+        ingredients = rng.sample(common, rng.randint(3, 8)) + rng.sample(rare, rng.randint(0, 3))
+        recipes.append({
+            'name': f"{rng.choice(STYLES)} {ingredients[0].title()} {rng.choice(DISHES)} #{recipe_id + 1}",
+            'ingredients': ingredients,
+            'instructions': f"Combine {', '.join(ingredients[:-1])} and {ingredients[-1]}."
+        })
+    return recipes
+
+
+def random_cart(rng, product_count=100000):
+    return [f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {rng.randint(1, product_count)}"
+            for _ in range(rng.randint(1, 12))]
+
+
+def scan_scores(index, product_names):
+    # Reference: coverage of every recipe computed one recipe at a time
+    have = set()
+    for name in product_names:
+        have |= {index.ingredients[ingredient_id] for ingredient_id in index.match_ingredients(name)}
+    scores = np.zeros(len(index))
+    for recipe_id, recipe in enumerate(index.recipes):
+        needed = {' '.join(normalize_tokens(ingredient)) for ingredient in recipe['ingredients']} - {''}
+        if needed:
+            scores[recipe_id] = len(needed & have) / len(needed)
+    return scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Recipe index build and suggestion latency on synthetic recipes')
+    parser.add_argument('--recipes', type=int, default=10000)
+    parser.add_argument('--queries', type=int, default=1000, help='Suggestion calls timed.')
+    parser.add_argument('--checks', type=int, default=50, help='Calls compared against the plain scan.')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Also write the generated recipes as JSON.')
+    args = parser.parse_args()
+
+    recipes = generate_recipes(args.recipes, args.seed)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            json.dump(recipes, handle)
+        print(f"{len(recipes)} recipes written to {args.output}")
+
+    started = time.perf_counter()
+    index = RecipeIndex(recipes)
+    print(f"{'build index':<32} {time.perf_counter() - started:>9.3f} s "
+          f"({len(index)} recipes, {len(index.ingredients)} ingredients)")
+
+    rng = random.Random(args.seed)
+    carts = [random_cart(rng) for _ in range(args.queries)]
+    latencies = []
+    for cart in carts:
+        started = time.perf_counter()
+        index.suggest(cart, 5)
+        latencies.append(time.perf_counter() - started)
+    latencies = np.array(latencies) * 1000
+    print(f"{'suggest (k=5)':<32} p50 {np.percentile(latencies, 50):.2f} ms, "
+          f"p95 {np.percentile(latencies, 95):.2f} ms, p99 {np.percentile(latencies, 99):.2f} ms")
+
+    # The best score returned by the index must equal the best coverage found by scanning
+    scan_latencies = []
+    for cart in carts[:args.checks]:
+        started = time.perf_counter()
+        expected = scan_scores(index, cart).max()
+        scan_latencies.append(time.perf_counter() - started)
+        results, _ = index.suggest(cart, 5)
+        best = results[0]['score'] if results else 0.0
+        assert abs(best - round(expected, 4)) < 1e-9, (cart, best, expected)
+    print(f"{'plain scan (reference)':<32} p50 {np.percentile(scan_latencies, 50) * 1000:.2f} ms; "
+          f"{min(args.checks, len(carts))} carts agree with the index")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+# SmartCart - Catalogue Cache
+# Process-local, read-only snapshot of products and categories, keyed by catalogue version
+
+import threading
+import time
+from array import array
+
+
+class CatalogueSnapshot:
+    # Column-wise storage: one array/list per field, rows addressed by position
+
+    def __init__(self, products, categories, version):
+        self.version = version
+        self.categories = [{'id': category_id, 'name': name} for category_id, name in categories]
+        category_names = {category_id: name for category_id, name in categories}
+
+        self.ids = array('q')
+        self.prices = array('d')
+        self.category_ids = array('q')
+        self.names = []
+        self.descriptions = []
+        for product_id, name, description, price, category_id in products:
+            self.ids.append(product_id)
+            self.names.append(name)
+            self.descriptions.append(description)
+            self.prices.append(price)
+            self.category_ids.append(category_id)
+
+        self.category_names = [category_names.get(category_id) for category_id in self.category_ids]
+        self.position = {product_id: row for row, product_id in enumerate(self.ids)}
+        self.by_name = sorted(range(len(self.ids)), key=lambda row: (self.names[row], self.ids[row]))
+        self.by_price = sorted(range(len(self.ids)), key=lambda row: (self.prices[row], self.ids[row]))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def get(self, product_id):
+        row = self.position.get(product_id)
+        if row is None:
+            return None
+        return {
+            'id': self.ids[row],
+            'name': self.names[row],
+            'description': self.descriptions[row],
+            'price': self.prices[row],
+            'category_id': self.category_ids[row],
+            'category': self.category_names[row]
+        }
+
+
+class CatalogueCache:
+
+    def __init__(self):
+        self.snapshot = None
+        self.hits = 0
+        self.misses = 0
+        self.rebuilds = 0
+        self.invalidations = 0
+        self.last_rebuild_ms = 0.0
+        self.total_rebuild_ms = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, version, load):
+        # load(version) -> CatalogueSnapshot; called at most once per version change
+        snapshot = self.snapshot
+        if snapshot is not None and snapshot.version == version:
+            self.hits += 1
+            return snapshot
+
+        with self._lock:
+            snapshot = self.snapshot
+            if snapshot is not None and snapshot.version == version:
+                self.hits += 1
+                return snapshot
+            self.misses += 1
+            started = time.perf_counter()
+            snapshot = load(version)
+            self.last_rebuild_ms = (time.perf_counter() - started) * 1000
+            self.total_rebuild_ms += self.last_rebuild_ms
+            self.rebuilds += 1
+            self.snapshot = snapshot
+            return snapshot
+
+    def invalidate(self):
+        self.snapshot = None
+        self.invalidations += 1
+
+    def metrics(self):
+        lookups = self.hits + self.misses
+        return {
+            'version': self.snapshot.version if self.snapshot else None,
+            'products': len(self.snapshot) if self.snapshot else 0,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0,
+            'rebuilds': self.rebuilds,
+            'invalidations': self.invalidations,
+            'last_rebuild_ms': round(self.last_rebuild_ms, 3),
+            'avg_rebuild_ms': round(self.total_rebuild_ms / self.rebuilds, 3) if self.rebuilds else 0
+        }
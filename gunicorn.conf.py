@@ -0,0 +1,25 @@
+# SmartCart - Gunicorn configuration
+# Every worker keeps its own in-process caches (app.py); the ones listed in WARM_UP
+# are loaded after the fork and before the worker accepts connections.
+
+import multiprocessing
+import os
+
+bind = os.environ.get('BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+worker_class = 'gthread'
+# Also bounds the warm-up in post_worker_init
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+keepalive = 5
+# Recycle workers now and then to bound memory growth; jitter avoids restarting them all at once
+max_requests = 10000
+max_requests_jitter = 1000
+accesslog = '-'
+
+
+def post_worker_init(worker):
+    from app import warm_up
+    timings = warm_up()
+    worker.log.info("Worker %s warmed up: %s", worker.pid,
+                    ', '.join(f"{step} {seconds:.3f}s" for step, seconds in timings.items()))
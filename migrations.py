@@ -0,0 +1,111 @@
+# SmartCart - Schema Migrations
+# Versioned, forward-only migrations for databases created by earlier releases.
+# Fresh databases get the same schema from db.create_all(); every step is therefore
+# written to be a no-op when its change is already present.
+
+from datetime import datetime
+
+from sqlalchemy import inspect, text
+
+MIGRATIONS = []
+
+
+def migration(version, description):
+    def register(func):
+        MIGRATIONS.append((version, description, func))
+        MIGRATIONS.sort(key=lambda entry: entry[0])
+        return func
+    return register
+
+
+def create_index(connection, name, table, columns, unique=False):
+    connection.execute(text(
+        f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"
+    ))
+
+
+def add_column(connection, table, column, ddl_type):
+    if column not in {col['name'] for col in inspect(connection).get_columns(table)}:
+        connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl_type}"))
+
+
+@migration(1, 'Unique (cart_id, product_id) on cart_item')
+def unique_cart_items(connection):
+    # Older databases may hold duplicate rows; fold them into the oldest one first
+    connection.execute(text(
+        "UPDATE cart_item SET quantity = ("
+        "SELECT SUM(other.quantity) FROM cart_item AS other "
+        "WHERE other.cart_id = cart_item.cart_id AND other.product_id = cart_item.product_id) "
+        "WHERE id IN (SELECT MIN(id) FROM cart_item GROUP BY cart_id, product_id HAVING COUNT(*) > 1)"
+    ))
+    connection.execute(text(
+        "DELETE FROM cart_item WHERE id NOT IN (SELECT MIN(id) FROM cart_item GROUP BY cart_id, product_id)"
+    ))
+    create_index(connection, 'uq_cart_item_cart_product', 'cart_item', ['cart_id', 'product_id'], unique=True)
+
+
+@migration(2, 'Secondary indexes for purchase history, analytics and catalogue filters')
+def secondary_indexes(connection):
+    create_index(connection, 'ix_cart_purchased', 'cart', ['is_purchased', 'purchased_at', 'id'])
+    create_index(connection, 'ix_cart_item_product_id', 'cart_item', ['product_id'])
+    create_index(connection, 'ix_product_category_name', 'product', ['category_id', 'name'])
+    create_index(connection, 'ix_product_category_price', 'product', ['category_id', 'price'])
+    create_index(connection, 'ix_product_name', 'product', ['name'])
+    create_index(connection, 'ix_product_price', 'product', ['price'])
+    create_index(connection, 'ix_product_sales_quantity', 'product_sales', ['quantity'])
+    create_index(connection, 'ix_product_pair_product_frequency', 'product_pair', ['product_id', 'frequency'])
+
+
+def backfill_purchase_snapshots(connection):
+    # Purchases recorded before snapshotting get the current product price/name -
+    # the closest approximation of what was paid that is still available.
+    connection.execute(text(
+        "UPDATE cart_item SET "
+        "unit_price = (SELECT price FROM product WHERE product.id = cart_item.product_id), "
+        "product_name = (SELECT name FROM product WHERE product.id = cart_item.product_id) "
+        "WHERE unit_price IS NULL AND cart_id IN (SELECT id FROM cart WHERE is_purchased)"
+    ))
+    connection.execute(text(
+        "UPDATE cart SET "
+        "total = (SELECT COALESCE(SUM(unit_price * quantity), 0) FROM cart_item WHERE cart_item.cart_id = cart.id), "
+        "item_count = (SELECT COALESCE(SUM(quantity), 0) FROM cart_item WHERE cart_item.cart_id = cart.id) "
+        "WHERE is_purchased AND total IS NULL"
+    ))
+
+
+@migration(3, 'Price and name snapshots on purchased carts and items')
+def purchase_snapshots(connection):
+    add_column(connection, 'cart', 'total', 'FLOAT')
+    add_column(connection, 'cart', 'item_count', 'INTEGER')
+    add_column(connection, 'cart_item', 'unit_price', 'FLOAT')
+    add_column(connection, 'cart_item', 'product_name', 'VARCHAR(200)')
+    backfill_purchase_snapshots(connection)
+
+
+@migration(4, 'Index for the price worker abandoned-job lookup')
+def price_job_heartbeat_index(connection):
+    create_index(connection, 'ix_price_refresh_job_status_heartbeat', 'price_refresh_job', ['status', 'heartbeat_at'])
+
+
+def current_version(connection):
+    connection.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_version ("
+        "version INTEGER PRIMARY KEY, description VARCHAR(200) NOT NULL, applied_at TIMESTAMP NOT NULL)"
+    ))
+    return connection.execute(text("SELECT MAX(version) FROM schema_version")).scalar() or 0
+
+
+def upgrade(connection):
+    # Applies pending migrations in order on an open transaction; returns what was applied
+    applied = []
+    version = current_version(connection)
+    for number, description, func in MIGRATIONS:
+        if number <= version:
+            continue
+        func(connection)
+        connection.execute(
+            text("INSERT INTO schema_version (version, description, applied_at) VALUES (:v, :d, :t)"),
+            {'v': number, 'd': description, 't': datetime.utcnow()}
+        )
+        applied.append((number, description))
+    return applied
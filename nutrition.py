@@ -0,0 +1,102 @@
+# SmartCart - Nutrition Engine
+# Per-product nutrient vectors in a dense matrix; cart totals are quantities x matrix products
+# and findings come from configurable threshold rules over derived metrics.
+
+import json
+import operator
+
+import numpy as np
+from scipy import sparse
+
+NUTRIENTS = ('kcal', 'protein', 'fat', 'carbs', 'fibre')
+
+OPERATORS = {'<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge}
+
+METRICS = ('kcal', 'protein_energy_share', 'fat_energy_share', 'carbs_energy_share', 'fibre_per_1000kcal')
+
+DEFAULT_RULES = [
+    {'name': 'fibre_rich', 'metric': 'fibre_per_1000kcal', 'op': '>=', 'value': 14,
+     'message': 'Good variety of fruits, vegetables and grains.'},
+    {'name': 'low_fibre', 'metric': 'fibre_per_1000kcal', 'op': '<', 'value': 8,
+     'message': 'Low in fibre; add fruits, vegetables or wholegrain bread.'},
+    {'name': 'high_fat', 'metric': 'fat_energy_share', 'op': '>', 'value': 0.35,
+     'message': 'More than 35% of the energy comes from fat.'},
+    {'name': 'high_protein', 'metric': 'protein_energy_share', 'op': '>', 'value': 0.30,
+     'message': 'Very protein-heavy basket; consider reducing meat consumption.'},
+    {'name': 'low_carbs', 'metric': 'carbs_energy_share', 'op': '<', 'value': 0.35,
+     'message': 'Few carbohydrates; add bread, potatoes or fruit.'}
+]
+
+
+def load_rules(path=None):
+    if not path:
+        return DEFAULT_RULES
+    with open(path, encoding='utf-8') as handle:
+        rules = json.load(handle)
+    for rule in rules:
+        if rule.get('op') not in OPERATORS or rule.get('metric') not in METRICS:
+            raise ValueError(f"Invalid nutrition rule: {rule}")
+    return rules
+
+
+def derive_metrics(totals):
+    # totals: (n, len(NUTRIENTS)) -> {metric: (n,) array}; shares are of total energy
+    kcal = totals[:, 0]
+    energy = np.where(kcal > 0, kcal, np.nan)
+    return {
+        'kcal': kcal,
+        'protein_energy_share': totals[:, 1] * 4 / energy,
+        'fat_energy_share': totals[:, 2] * 9 / energy,
+        'carbs_energy_share': totals[:, 3] * 4 / energy,
+        'fibre_per_1000kcal': totals[:, 4] * 1000 / energy
+    }
+
+
+class NutritionEngine:
+
+    def __init__(self, rows, version=None, rules=None):
+        # rows: [(product_id, kcal, protein, fat, carbs, fibre), ...], values per unit sold
+        data = np.array([row[1:] for row in rows], dtype=np.float64).reshape(-1, len(NUTRIENTS))
+        self.version = version
+        self.rules = rules or DEFAULT_RULES
+        self.matrix = np.nan_to_num(data)
+        self.position = {product_id: index for index, (product_id, *_) in enumerate(rows)}
+
+    def quantity_matrix(self, items, n_carts):
+        # items: [(cart_row, product_id, quantity)] -> sparse (n_carts, n_products); unknown products dropped
+        rows, cols, quantities = [], [], []
+        for cart_row, product_id, quantity in items:
+            col = self.position.get(product_id)
+            if col is not None:
+                rows.append(cart_row)
+                cols.append(col)
+                quantities.append(quantity)
+        return sparse.csr_matrix((quantities, (rows, cols)), shape=(n_carts, len(self.position)))
+
+    def totals_many(self, items, n_carts):
+        return np.asarray(self.quantity_matrix(items, n_carts) @ self.matrix).reshape(n_carts, len(NUTRIENTS))
+
+    def evaluate(self, totals):
+        # -> metrics per cart and, per rule, a boolean array of the carts it fires for
+        metrics = derive_metrics(totals)
+        fired = {}
+        for rule in self.rules:
+            values = metrics[rule['metric']]
+            with np.errstate(invalid='ignore'):
+                fired[rule['name']] = OPERATORS[rule['op']](values, rule['value']) & ~np.isnan(values)
+        return metrics, fired
+
+    def analyse(self, quantities):
+        # quantities: {product_id: quantity} for a single cart
+        totals = self.totals_many([(0, product_id, quantity) for product_id, quantity in quantities.items()], 1)
+        metrics, fired = self.evaluate(totals)
+        return {
+            'totals': {nutrient: round(float(totals[0, index]), 1) for index, nutrient in enumerate(NUTRIENTS)},
+            'metrics': {
+                name: None if np.isnan(values[0]) else round(float(values[0]), 3) for name, values in metrics.items()
+            },
+            'findings': [
+                {'rule': rule['name'], 'message': rule['message']} for rule in self.rules if fired[rule['name']][0]
+            ],
+            'missing': [product_id for product_id in quantities if product_id not in self.position]
+        }
@@ -0,0 +1,110 @@
+# SmartCart - Recipe Matcher
+# Inverted ingredient -> recipe index; product names are mapped to ingredients through a token index
+
+import json
+import re
+import unicodedata
+
+import numpy as np
+
+
+def normalize_tokens(text):
+    # "Fresh Tomatoes" -> ['fresh', 'tomato']; accents and simple plurals are folded
+    decomposed = unicodedata.normalize('NFD', text or '')
+    folded = ''.join(ch for ch in decomposed if not unicodedata.combining(ch)).casefold()
+    tokens = []
+    for token in re.findall(r'[^\W\d_]+', folded):
+        if len(token) > 4 and token.endswith('ies'):
+            token = token[:-3] + 'y'
+        elif len(token) > 4 and token.endswith('oes'):
+            token = token[:-2]
+        elif len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+class RecipeIndex:
+
+    def __init__(self, recipes):
+        # recipes: [{'name': ..., 'ingredients': [...], 'instructions': ...}, ...]
+        self.recipes = recipes
+        self.ingredients = []
+        ingredient_ids = {}
+        postings = []
+        self.ingredient_counts = np.zeros(len(recipes), dtype=np.float64)
+
+        for recipe_id, recipe in enumerate(recipes):
+            seen = set()
+            for ingredient in recipe['ingredients']:
+                key = tuple(normalize_tokens(ingredient))
+                if not key or key in seen:
+                    continue
+                seen.add(key)
+                if key not in ingredient_ids:
+                    ingredient_ids[key] = len(self.ingredients)
+                    self.ingredients.append(' '.join(key))
+                    postings.append([])
+                postings[ingredient_ids[key]].append(recipe_id)
+            self.ingredient_counts[recipe_id] = len(seen)
+
+        self.postings = [np.array(recipe_ids, dtype=np.int64) for recipe_ids in postings]
+        # First token -> [(token tuple, ingredient id)], longest phrases first
+        self.phrases = {}
+        for key, ingredient_id in ingredient_ids.items():
+            self.phrases.setdefault(key[0], []).append((key, ingredient_id))
+        for candidates in self.phrases.values():
+            candidates.sort(key=lambda candidate: -len(candidate[0]))
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, encoding='utf-8') as handle:
+            return cls(json.load(handle))
+
+    def __len__(self):
+        return len(self.recipes)
+
+    def match_ingredients(self, product_name):
+        # Every ingredient phrase that occurs in the name: "Feta Cheese" -> feta cheese, cheese
+        tokens = normalize_tokens(product_name)
+        found = set()
+        for start, token in enumerate(tokens):
+            for key, ingredient_id in self.phrases.get(token, ()):
+                if tuple(tokens[start:start + len(key)]) == key:
+                    found.add(ingredient_id)
+        return found
+
+    def suggest(self, product_names, k=5):
+        matched = {}
+        for name in product_names:
+            ingredient_ids = self.match_ingredients(name)
+            if ingredient_ids:
+                matched[name] = sorted(ingredient_ids)
+        available = {ingredient_id for ingredient_ids in matched.values() for ingredient_id in ingredient_ids}
+        if not available or not self.recipes:
+            return [], {}
+
+        # Coverage = share of a recipe's ingredients that the products provide
+        hits = np.bincount(
+            np.concatenate([self.postings[ingredient_id] for ingredient_id in available]),
+            minlength=len(self.recipes)
+        )
+        scores = hits / np.maximum(self.ingredient_counts, 1)
+        candidates = np.flatnonzero(hits)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-(scores[candidates] + hits[candidates] * 1e-6), k - 1)[:k]]
+        candidates = sorted(candidates, key=lambda recipe_id: (-scores[recipe_id], -hits[recipe_id], recipe_id))
+
+        have = {self.ingredients[ingredient_id] for ingredient_id in available}
+        results = []
+        for recipe_id in candidates:
+            recipe = self.recipes[recipe_id]
+            needed = [' '.join(normalize_tokens(ingredient)) for ingredient in recipe['ingredients']]
+            results.append({
+                'name': recipe['name'],
+                'score': round(float(scores[recipe_id]), 4),
+                'matched': [ingredient for ingredient in needed if ingredient in have],
+                'missing': [ingredient for ingredient in needed if ingredient not in have],
+                'instructions': recipe.get('instructions', '')
+            })
+        return results, {name: [self.ingredients[i] for i in ids] for name, ids in matched.items()}
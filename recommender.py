@@ -0,0 +1,141 @@
+# SmartCart - Recommendation Engine
+# Item-item recommendations over a sparse cart x product matrix
+
+import threading
+import time
+
+import numpy as np
+from scipy import sparse
+
+METHODS = ('cosine', 'lift')
+
+
+class Model:
+    # Everything recommend_many() reads, replaced as one object so readers never mix two builds
+
+    def __init__(self, product_ids, popular, similarity):
+        self.product_ids = product_ids
+        self.column = {int(product_id): col for col, product_id in enumerate(product_ids)}
+        self.popular = popular
+        self.similarity = similarity
+
+
+class RecommendationEngine:
+    # Built from (cart_id, product_id, quantity) rows of purchased carts.
+    # Readers keep using the current model while a rebuild is in progress.
+
+    def __init__(self, rebuild_interval=60, chunk_size=256):
+        self.rebuild_interval = rebuild_interval
+        self.chunk_size = chunk_size
+        self.version = None
+        self.built_at = 0.0
+        self.build_seconds = 0.0
+        self.model = Model(np.array([], dtype=np.int64), [], {method: sparse.csr_matrix((0, 0)) for method in METHODS})
+        self._lock = threading.Lock()
+
+    def is_stale(self, version):
+        if self.version is None:
+            return True
+        return version != self.version and time.time() - self.built_at >= self.rebuild_interval
+
+    def refresh(self, version, load_rows, background=True):
+        # The first build blocks, since there is nothing to serve yet. Later rebuilds run in a
+        # daemon thread (one at a time) and requests carry on with the old model meanwhile.
+        if not self.is_stale(version) or not self._lock.acquire(blocking=self.version is None):
+            return
+        if self.version is not None and background:
+            threading.Thread(target=self._rebuild, args=(version, load_rows), daemon=True).start()
+            return
+        self._rebuild(version, load_rows)
+
+    def _rebuild(self, version, load_rows):
+        try:
+            if self.is_stale(version):
+                self.build(load_rows(), version)
+        finally:
+            self._lock.release()
+
+    def build(self, rows, version):
+        # rows: (n, 3) array or sequence of (cart_id, product_id, quantity)
+        started = time.perf_counter()
+        data = np.asarray(rows, dtype=np.float64).reshape(-1, 3)
+        cart_ids, cart_rows = np.unique(data[:, 0].astype(np.int64), return_inverse=True)
+        product_ids, product_cols = np.unique(data[:, 1].astype(np.int64), return_inverse=True)
+        n_carts, n_products = len(cart_ids), len(product_ids)
+
+        # Binary cart x product incidence matrix; co-occurrence is X^T X
+        incidence = sparse.csr_matrix(
+            (np.ones(len(data)), (cart_rows, product_cols)), shape=(n_carts, n_products)
+        )
+        incidence.data[:] = 1
+        co_occurrence = (incidence.T @ incidence).tocoo()
+        carts_with = np.asarray(incidence.sum(axis=0)).ravel()
+        off_diagonal = co_occurrence.row != co_occurrence.col
+        rows_idx = co_occurrence.row[off_diagonal]
+        cols_idx = co_occurrence.col[off_diagonal]
+        counts = co_occurrence.data[off_diagonal]
+        cosine = counts / np.sqrt(carts_with[rows_idx] * carts_with[cols_idx])
+        lift = counts * n_carts / (carts_with[rows_idx] * carts_with[cols_idx])
+        shape = (n_products, n_products)
+
+        quantities = np.bincount(product_cols, weights=data[:, 2], minlength=n_products)
+        popular = np.argsort(-quantities, kind='stable')
+
+        self.model = Model(product_ids, [(int(product_ids[col]), float(quantities[col])) for col in popular], {
+            'cosine': sparse.csr_matrix((cosine, (rows_idx, cols_idx)), shape=shape),
+            'lift': sparse.csr_matrix((lift, (rows_idx, cols_idx)), shape=shape)
+        })
+        self.version = version
+        self.built_at = time.time()
+        self.build_seconds = time.perf_counter() - started
+
+    def recommend(self, seed_product_ids, k=5, method='cosine'):
+        return self.recommend_many([seed_product_ids], k, method)[0]
+
+    def recommend_many(self, seeds, k=5, method='cosine'):
+        # seeds: one list of product ids per cart; returns [(product_id, score), ...] per cart
+        model = self.model
+        similarity = model.similarity[method]
+        results = []
+        for start in range(0, len(seeds), self.chunk_size):
+            chunk = seeds[start:start + self.chunk_size]
+            rows, cols = [], []
+            for row, product_ids in enumerate(chunk):
+                for product_id in product_ids:
+                    col = model.column.get(product_id)
+                    if col is not None:
+                        rows.append(row)
+                        cols.append(col)
+            seed_matrix = sparse.csr_matrix(
+                (np.ones(len(rows)), (rows, cols)), shape=(len(chunk), len(model.product_ids))
+            )
+            # Scores stay sparse: each row holds only the products co-bought with the seeds, so
+            # memory follows the co-occurrences rather than chunk_size x the catalogue size
+            scores = (seed_matrix @ similarity).tocsr()
+            scores.sort_indices()
+
+            for row, product_ids in enumerate(chunk):
+                cols = scores.indices[scores.indptr[row]:scores.indptr[row + 1]]
+                values = scores.data[scores.indptr[row]:scores.indptr[row + 1]]
+                seed_cols = seed_matrix.indices[seed_matrix.indptr[row]:seed_matrix.indptr[row + 1]]
+                keep = (values > 0) & ~np.isin(cols, seed_cols)
+                results.append(self._top_k(model, cols[keep], values[keep], set(product_ids), k))
+        return results
+
+    def _top_k(self, model, cols, values, exclude, k):
+        # cols/values: the candidate columns of one cart and their scores
+        if len(cols) > k:
+            best = np.argpartition(-values, k - 1)[:k]
+            cols, values = cols[best], values[best]
+        order = np.argsort(-values, kind='stable')
+        top = [(int(model.product_ids[col]), float(value)) for col, value in zip(cols[order], values[order])]
+
+        # Fill up with the most popular products when the cart has little signal
+        if len(top) < k:
+            chosen = exclude | {product_id for product_id, _ in top}
+            for product_id, _ in model.popular:
+                if len(top) >= k:
+                    break
+                if product_id not in chosen:
+                    top.append((product_id, 0.0))
+        return top
@@ -0,0 +1,143 @@
+# SmartCart - Competitor Price Scraper
+# Asynchronous fetcher with per-store connection pools, concurrency limits,
+# per-host rate limiting, retries with backoff and pluggable HTML parsers.
+
+import asyncio
+import os
+import random
+import re
+import time
+from dataclasses import dataclass
+from urllib.parse import quote_plus, urlsplit
+
+import aiohttp
+
+PARSERS = {}
+
+
+def parser(name):
+    def register(func):
+        PARSERS[name] = func
+        return func
+    return register
+
+
+def parse_amount(text):
+    # "1,50 €" / "€1.50" / "1.50" -> 1.5
+    match = re.search(r'(\d+(?:[.,]\d{1,2})?)', text)
+    return float(match.group(1).replace(',', '.')) if match else None
+
+
+@parser('store_a')
+def parse_store_a(html):
+    # <span class="price">1,50 €</span>
+    match = re.search(r'<span[^>]*class="[^"]*\bprice\b[^"]*"[^>]*>([^<]+)</span>', html)
+    return parse_amount(match.group(1)) if match else None
+
+
+@parser('store_b')
+def parse_store_b(html):
+    # <div class="product" data-price="1.50">
+    match = re.search(r'data-price="([^"]+)"', html)
+    return parse_amount(match.group(1)) if match else None
+
+
+@dataclass
+class Store:
+    name: str
+    search_url: str
+    parser: str
+    concurrency: int = 4
+    rate: float = 5.0
+
+
+def default_stores():
+    return [
+        Store('Store A', os.environ.get('STORE_A_URL', 'http://localhost:8101/search?q={query}'), 'store_a'),
+        Store('Store B', os.environ.get('STORE_B_URL', 'http://localhost:8102/products?name={query}'), 'store_b')
+    ]
+
+
+class RateLimiter:
+    # Spaces requests to one host at least 1/rate seconds apart
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0
+        self.next_slot = 0.0
+        self.lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self.lock:
+            now = time.monotonic()
+            delay = self.next_slot - now
+            self.next_slot = max(now, self.next_slot) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+@dataclass
+class ScrapeResult:
+    product_id: int
+    store: str
+    price: float = None
+    error: str = None
+
+
+class PriceScraper:
+
+    def __init__(self, stores=None, timeout=10, retries=3, backoff=0.5):
+        self.stores = stores or default_stores()
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.retries = retries
+        self.backoff = backoff
+
+    async def fetch_price(self, session, limiter, store, product_id, product_name):
+        url = store.search_url.format(query=quote_plus(product_name))
+        error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                await asyncio.sleep(self.backoff * 2 ** (attempt - 1) * (1 + random.random()))
+            await limiter.wait()
+            try:
+                async with session.get(url) as response:
+                    if response.status == 404:
+                        return ScrapeResult(product_id, store.name)
+                    if response.status == 429 or response.status >= 500:
+                        error = f'HTTP {response.status}'
+                        continue
+                    response.raise_for_status()
+                    html = await response.text()
+                price = PARSERS[store.parser](html)
+                if price is None:
+                    # The page loaded but its layout did not match; keep the last good price
+                    return ScrapeResult(product_id, store.name, error='price not found in page')
+                return ScrapeResult(product_id, store.name, price)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+                error = str(exc) or exc.__class__.__name__
+        return ScrapeResult(product_id, store.name, error=error)
+
+    async def scrape_store(self, store, limiter, products):
+        # One pooled session per store; the connector caps open connections to it
+        connector = aiohttp.TCPConnector(limit=store.concurrency, limit_per_host=store.concurrency)
+        semaphore = asyncio.Semaphore(store.concurrency)
+
+        async def bounded(product_id, product_name):
+            async with semaphore:
+                return await self.fetch_price(session, limiter, store, product_id, product_name)
+
+        async with aiohttp.ClientSession(connector=connector, timeout=self.timeout) as session:
+            return await asyncio.gather(*(bounded(product_id, name) for product_id, name in products))
+
+    async def scrape(self, products):
+        # products: [(product_id, name), ...] -> [ScrapeResult, ...] for every store
+        limiters = {}
+        for store in sorted(self.stores, key=lambda store: store.rate):
+            limiters.setdefault(urlsplit(store.search_url).netloc, RateLimiter(store.rate))
+        per_store = await asyncio.gather(*(
+            self.scrape_store(store, limiters[urlsplit(store.search_url).netloc], products)
+            for store in self.stores
+        ))
+        return [result for results in per_store for result in results]
+
+    def scrape_sync(self, products):
+        return asyncio.run(self.scrape(products))
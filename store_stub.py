@@ -0,0 +1,54 @@
+# SmartCart - Competitor Store Stand-ins
+# Local HTTP servers imitating Store A and Store B for development and benchmarks.
+# Usage: python store_stub.py   (Store A on :8101, Store B on :8102)
+
+import hashlib
+import sys
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+
+def stub_price(store, name):
+    # Stable pseudo-random price per (store, product) between 0.50 and 20.00
+    digest = hashlib.sha256(f'{store}:{name.lower()}'.encode('utf-8')).digest()
+    return round(0.5 + int.from_bytes(digest[:4], 'big') % 1951 / 100, 2)
+
+
+class StoreAHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        query = parse_qs(urlsplit(self.path).query).get('q', [''])[0]
+        price = f"{stub_price('a', query):.2f}".replace('.', ',')
+        self.reply(f'<html><body><h1>{query}</h1><span class="price">{price} €</span></body></html>')
+
+    def reply(self, html):
+        body = html.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StoreBHandler(StoreAHandler):
+    def do_GET(self):
+        query = parse_qs(urlsplit(self.path).query).get('name', [''])[0]
+        self.reply(f'<html><body><div class="product" data-price="{stub_price("b", query):.2f}">{query}</div></body></html>')
+
+
+def serve(port_a=8101, port_b=8102):
+    servers = [ThreadingHTTPServer(('localhost', port_a), StoreAHandler),
+               ThreadingHTTPServer(('localhost', port_b), StoreBHandler)]
+    for server in servers:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    return servers
+
+
+if __name__ == '__main__':
+    ports = [int(port) for port in sys.argv[1:3]] or [8101, 8102]
+    serve(*ports)
+    print(f"Store A on http://localhost:{ports[0]}, Store B on http://localhost:{ports[1]} (Ctrl+C to stop)")
+    threading.Event().wait()
@@ -1,33 +1,83 @@
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 
 # Configure page
 st.set_page_config(page_title="SmartCart", layout="wide")
 
 # API base URL
 API_BASE = "http://localhost:5000/api"
+API_BASES = ["http://localhost:5000/api", "http://127.0.0.1:5000/api"]
+
+# (connect, read) timeouts in seconds
+REQUEST_TIMEOUT = (3.05, 15)
+
+# One pooled keep-alive session for the whole Streamlit server; idempotent GETs are retried
+@st.cache_resource
+def api_session():
+    session = requests.Session()
+    retries = Retry(total=3, backoff_factor=0.3, status_forcelist=(502, 503, 504), allowed_methods=["GET"])
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=20, max_retries=retries)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def api_get(path, params=None):
+    return api_session().get(f"{API_BASE}{path}", params=params, timeout=REQUEST_TIMEOUT)
+
+def api_post(path, data=None):
+    return api_session().post(f"{API_BASE}{path}", json=data, timeout=REQUEST_TIMEOUT)
+
+def fetch_json(url, params=None):
+    # Raises on errors so that failed responses are never cached
+    response = api_session().get(url, params=params, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    return response.json()
+
+# Cached reads, grouped by how they are invalidated; the URL is part of the cache key
+@st.cache_data(ttl=300, show_spinner=False)
+def fetch_catalogue(url, params=None):
+    return fetch_json(url, params)
+
+@st.cache_data(ttl=300, show_spinner=False)
+def fetch_catalogue_page(url, params=None):
+    # -> (items, next cursor or None)
+    response = api_session().get(url, params=params, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    return response.json(), response.headers.get('X-Next-Cursor')
+
+@st.cache_data(ttl=60, show_spinner=False)
+def fetch_cart_data(url, params=None):
+    return fetch_json(url, params)
+
+@st.cache_data(ttl=30, show_spinner=False)
+def fetch_sales_data(url, params=None):
+    return fetch_json(url, params)
+
+def cart_changed(purchased=False):
+    fetch_cart_data.clear()
+    if purchased:
+        fetch_sales_data.clear()
 
 def check_api():
-    try:
-        urls_to_try = [
-            "http://localhost:5000/api/products",
-            "http://127.0.0.1:5000/api/products"
-        ]
-        
-        for url in urls_to_try:
-            try:
-                response = requests.get(url, timeout=5)
-                if response.status_code == 200:
-                    global API_BASE
-                    API_BASE = url.replace('/products', '')
-                    return True
-            except:
-                continue
-        return False
-    except:
-        return False
+    # Probed once per browser session; a failed probe is retried on the next rerun
+    global API_BASE
+    if st.session_state.get('api_base'):
+        API_BASE = st.session_state.api_base
+        return True
+    
+    for base in API_BASES:
+        try:
+            response = api_session().get(f"{base}/categories", timeout=(1, 3))
+            if response.status_code == 200:
+                API_BASE = st.session_state.api_base = base
+                return True
+        except:
+            continue
+    return False
 
-def get_products(search="", category_id=None, sort_by="name"):
+def get_products(search="", category_id=None, sort_by="name", limit=None, cursor=None, fields=None):
     params = {}
     if search:
         params['search'] = search
@@ -35,23 +85,54 @@ def get_products(search="", category_id=None, sort_by="name"):
         params['category_id'] = category_id
     if sort_by:
         params['sort_by'] = sort_by
+    if limit:
+        params['limit'] = limit
+    if cursor:
+        params['cursor'] = cursor
+    if fields:
+        params['fields'] = fields
     
     try:
-        response = requests.get(f"{API_BASE}/products", params=params)
-        return response.json() if response.status_code == 200 else []
+        return fetch_catalogue(f"{API_BASE}/products", params)
     except:
         return []
 
+# Product pickers search the catalogue instead of listing all of it; at most PICKER_LIMIT matches
+PICKER_LIMIT = 50
+
+def search_products(key):
+    search_term = st.text_input("Search products:", key=f"{key}_search", placeholder="e.g. milk")
+    products = get_products(search=search_term, sort_by="relevance" if search_term else "name",
+                            limit=PICKER_LIMIT, fields="id,name")
+    if len(products) == PICKER_LIMIT:
+        st.caption(f"Showing the first {PICKER_LIMIT} matches; refine the search to narrow them down")
+    return products
+
+def get_product_page(search="", category_id=None, sort_by="name", limit=24, cursor=None):
+    params = {'limit': limit, 'fields': 'id,name,description,price,category'}
+    if search:
+        params['search'] = search
+    if category_id:
+        params['category_id'] = category_id
+    if sort_by:
+        params['sort_by'] = sort_by
+    if cursor:
+        params['cursor'] = cursor
+    
+    try:
+        return fetch_catalogue_page(f"{API_BASE}/products", params)
+    except:
+        return [], None
+
 def get_categories():
     try:
-        response = requests.get(f"{API_BASE}/categories")
-        return response.json() if response.status_code == 200 else []
+        return fetch_catalogue(f"{API_BASE}/categories")
     except:
         return []
 
 def create_cart():
     try:
-        response = requests.post(f"{API_BASE}/cart")
+        response = api_post("/cart")
         return response.json() if response.status_code == 200 else None
     except:
         return None
@@ -59,56 +140,101 @@ def create_cart():
 def add_to_cart(cart_id, product_id, quantity=1):
     try:
         data = {"product_id": product_id, "quantity": quantity}
-        response = requests.post(f"{API_BASE}/cart/{cart_id}/add", json=data)
+        response = api_post(f"/cart/{cart_id}/add", data)
+        cart_changed()
         return response.status_code == 200
     except:
         return False
 
-def get_cart(cart_id):
+def update_cart_items(cart_id, operations):
+    # operations: [{"op": "add"|"set"|"remove", "product_id": ..., "quantity": ...}]
     try:
-        response = requests.get(f"{API_BASE}/cart/{cart_id}")
+        data = {"operations": operations}
+        response = api_post(f"/cart/{cart_id}/items:batch", data)
+        cart_changed()
         return response.json() if response.status_code == 200 else None
     except:
         return None
 
+def get_cart(cart_id):
+    try:
+        return fetch_cart_data(f"{API_BASE}/cart/{cart_id}")
+    except:
+        return None
+
+def get_cart_summary(cart_id):
+    try:
+        return fetch_cart_data(f"{API_BASE}/cart/{cart_id}/summary")
+    except:
+        return None
+
+def show_cart_badge(placeholder):
+    cart_id = st.session_state.current_cart_id
+    if not cart_id:
+        return
+    summary = get_cart_summary(cart_id)
+    if summary:
+        placeholder.info(f"Current cart: #{cart_id} · {summary['item_count']} items · €{summary['total']:.2f}")
+    else:
+        placeholder.info(f"Current cart: #{cart_id}")
+
 def purchase_cart(cart_id):
     try:
-        response = requests.post(f"{API_BASE}/cart/{cart_id}/purchase")
+        response = api_post(f"/cart/{cart_id}/purchase")
+        cart_changed(purchased=True)
         return response.status_code == 200
     except:
         return False
 
 def get_stats():
     try:
-        response = requests.get(f"{API_BASE}/stats")
-        return response.json() if response.status_code == 200 else {}
+        return fetch_sales_data(f"{API_BASE}/stats")
     except:
         return {}
 
-def get_purchases():
+def get_sales_timeseries(granularity="day", category_id=None):
+    params = {'granularity': granularity}
+    if category_id:
+        params['category_id'] = category_id
     try:
-        response = requests.get(f"{API_BASE}/purchases")
-        return response.json() if response.status_code == 200 else []
+        return fetch_sales_data(f"{API_BASE}/stats/timeseries", params)
+    except:
+        return {}
+
+def get_purchases(limit=10, after=None):
+    params = {'limit': limit}
+    if after:
+        params['after'] = after
+    
+    try:
+        return fetch_sales_data(f"{API_BASE}/purchases", params)
     except:
         return []
 
-def get_recommended_cart():
+def get_recommended_cart(cart_id=None):
+    params = {'cart_id': cart_id} if cart_id else {}
     try:
-        response = requests.get(f"{API_BASE}/recommend-cart")
-        return response.json() if response.status_code == 200 else {}
+        return fetch_cart_data(f"{API_BASE}/recommend-cart", params)
     except:
         return {}
 
 def get_frequently_bought_together(product_id):
     try:
-        response = requests.get(f"{API_BASE}/frequently-bought-together/{product_id}")
-        return response.json() if response.status_code == 200 else {}
+        return fetch_sales_data(f"{API_BASE}/frequently-bought-together/{product_id}")
     except:
         return {}
 
 def compare_prices(product_id):
     try:
-        response = requests.get(f"{API_BASE}/compare-price/{product_id}")
+        response = api_get(f"/compare-price/{product_id}")
+        return response.json() if response.status_code == 200 else {}
+    except:
+        return {}
+
+def compare_basket_prices(cart_id=None, product_ids=None):
+    data = {"cart_id": cart_id} if cart_id else {"product_ids": product_ids}
+    try:
+        response = api_post("/compare-prices", data)
         return response.json() if response.status_code == 200 else {}
     except:
         return {}
@@ -116,7 +242,7 @@ def compare_prices(product_id):
 def get_recipe_suggestion(products):
     try:
         data = {"products": products}
-        response = requests.post(f"{API_BASE}/recipe-suggestion", json=data)
+        response = api_post("/recipe-suggestion", data)
         return response.json() if response.status_code == 200 else {}
     except:
         return {}
@@ -124,7 +250,7 @@ def get_recipe_suggestion(products):
 def analyze_nutrition(cart_id):
     try:
         data = {"cart_id": cart_id}
-        response = requests.post(f"{API_BASE}/nutrition-analysis", json=data)
+        response = api_post("/nutrition-analysis", data)
         return response.json() if response.status_code == 200 else {}
     except:
         return {}
@@ -168,6 +294,26 @@ def main():
     elif page == "AI Features":
         show_ai_page()
 
+def add_grid_to_cart(grid_key, products):
+    # Submit callback, run before the rerun: after a successful add the grid gets a new key, so it
+    # is drawn again with every Qty back at 0 and a second submit cannot add the same items twice
+    edited_rows = st.session_state[grid_key]['edited_rows']
+    operations = [
+        {'op': 'add', 'product_id': products[int(row)]['id'], 'quantity': int(values['Qty'])}
+        for row, values in edited_rows.items() if values.get('Qty')
+    ]
+    if not st.session_state.current_cart_id:
+        st.session_state.grid_message = ('warning', "Create cart first!")
+    elif not operations:
+        st.session_state.grid_message = ('info', "Set a quantity for the products to add")
+    elif update_cart_items(st.session_state.current_cart_id, operations):
+        st.session_state.grid_message = (
+            'success', f"Added {len(operations)} products to cart #{st.session_state.current_cart_id}"
+        )
+        st.session_state.grid_version = st.session_state.get('grid_version', 0) + 1
+    else:
+        st.session_state.grid_message = ('error', "Error")
+
 def show_products_page():
     st.header("Product Catalog")
     
@@ -181,67 +327,84 @@ def show_products_page():
                 st.success(f"Created cart #{cart['id']}")
     
     with col2:
-        if st.session_state.current_cart_id:
-            st.info(f"Current cart: #{st.session_state.current_cart_id}")
-    
-    # Search and filter
-    col1, col2, col3 = st.columns([2, 1, 1])
-    
-    with col1:
-        search_term = st.text_input("Search products:")
-    
-    with col2:
-        categories = get_categories()
-        category_options = ["All categories"] + [cat['name'] for cat in categories]
-        selected_category = st.selectbox("Category:", category_options)
+        # Filled after the grid so items added in this run are counted
+        cart_badge = st.empty()
     
-    with col3:
-        sort_options = ["name", "price"]
-        sort_by = st.selectbox("Sort by:", sort_options)
+    # Search and filter; the form only reruns on submit, not on every keystroke
+    if 'product_filters' not in st.session_state:
+        st.session_state.product_filters = {'search': "", 'category_id': None, 'sort_by': "name"}
+        st.session_state.product_cursors = [None]
     
-    # Get category ID
-    category_id = None
-    if selected_category != "All categories":
-        for cat in categories:
-            if cat['name'] == selected_category:
-                category_id = cat['id']
-                break
-    
-    # Get products
-    products = get_products(search_term, category_id, sort_by)
+    categories = get_categories()
+    with st.form("product_search"):
+        col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
+        with col1:
+            search_term = st.text_input("Search products:")
+        with col2:
+            category_options = ["All categories"] + [cat['name'] for cat in categories]
+            selected_category = st.selectbox("Category:", category_options)
+        with col3:
+            sort_by = st.selectbox("Sort by:", ["relevance", "name", "price"])
+        with col4:
+            page_size = st.selectbox("Per page:", [24, 48, 96])
+        
+        if st.form_submit_button("Search"):
+            category_id = None
+            if selected_category != "All categories":
+                category_id = next(cat['id'] for cat in categories if cat['name'] == selected_category)
+            st.session_state.product_filters = {
+                'search': search_term, 'category_id': category_id, 'sort_by': sort_by, 'limit': page_size
+            }
+            st.session_state.product_cursors = [None]
+    
+    # Fetch one page; cursors of visited pages are kept for "Previous"
+    filters = st.session_state.product_filters
+    cursors = st.session_state.product_cursors
+    page_number = len(cursors)
+    products, next_cursor = get_product_page(
+        filters['search'], filters['category_id'], filters['sort_by'], filters.get('limit', 24), cursors[-1]
+    )
     
     if not products:
         st.warning("No products found")
+        show_cart_badge(cart_badge)
         return
     
-    st.subheader(f"Found {len(products)} products")
+    # One grid for the whole page; quantities are sent together with a single add action
+    grid_key = f"grid_{page_number}_{cursors[-1]}_{st.session_state.get('grid_version', 0)}"
+    with st.form("product_grid"):
+        st.data_editor(
+            [
+                {'id': p['id'], 'Product': p['name'], 'Description': p['description'],
+                 'Category': p['category'], 'Price (€)': p['price'], 'Qty': 0}
+                for p in products
+            ],
+            column_config={
+                'id': None,
+                'Price (€)': st.column_config.NumberColumn(format="%.2f"),
+                'Qty': st.column_config.NumberColumn(min_value=0, max_value=99, step=1)
+            },
+            disabled=['Product', 'Description', 'Category', 'Price (€)'],
+            hide_index=True,
+            use_container_width=True,
+            key=grid_key
+        )
+        st.form_submit_button("Add selected to cart", on_click=add_grid_to_cart, args=(grid_key, products))
     
-    # Display products
-    for product in products:
-        col1, col2, col3, col4 = st.columns([3, 1, 1, 1])
-        
-        with col1:
-            st.write(f"**{product['name']}**")
-            st.write(f"{product['description']}")
-            st.write(f"Category: {product['category']}")
-        
-        with col2:
-            st.write(f"€{product['price']:.2f}")
-        
-        with col3:
-            qty = st.number_input("Qty", min_value=1, value=1, key=f"qty_{product['id']}")
-        
-        with col4:
-            if st.button("Add", key=f"add_{product['id']}"):
-                if st.session_state.current_cart_id:
-                    if add_to_cart(st.session_state.current_cart_id, product['id'], qty):
-                        st.success("Added!")
-                    else:
-                        st.error("Error")
-                else:
-                    st.warning("Create cart first!")
-        
-        st.markdown("---")
+    if 'grid_message' in st.session_state:
+        level, message = st.session_state.pop('grid_message')
+        getattr(st, level)(message)
+    show_cart_badge(cart_badge)
+    
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        if page_number > 1:
+            st.button("Previous", on_click=cursors.pop)
+    with col2:
+        st.caption(f"Page {page_number}")
+    with col3:
+        if next_cursor:
+            st.button("Next", on_click=cursors.append, args=(next_cursor,))
 
 def show_cart_page():
     st.header("Cart Management")
@@ -275,7 +438,6 @@ def show_cart_page():
     # Display cart
     st.subheader(f"Cart #{cart['id']}")
     
-    total = 0
     for item in cart['items']:
         col1, col2, col3, col4 = st.columns([3, 1, 1, 1])
         with col1:
@@ -286,10 +448,14 @@ def show_cart_page():
             st.write(f"x{item['quantity']}")
         with col4:
             st.write(f"€{item['total']:.2f}")
-        total += item['total']
     
     st.markdown("---")
-    st.markdown(f"### Total: €{total:.2f}")
+    st.markdown(f"### Total: €{cart['total']:.2f}")
+    
+    if st.button("Suggest Products for this Cart"):
+        rec_data = get_recommended_cart(st.session_state.current_cart_id)
+        for rec in rec_data.get('recommendations', []):
+            st.write(f"- {rec['name']} - €{rec['price']:.2f}")
     
     # Purchase button
     if st.button("Complete Purchase", type="primary"):
@@ -325,6 +491,29 @@ def show_analytics_page():
         for product in stats['most_popular_products']:
             st.write(f"- {product['name']}: {product['count']} times")
     
+    # Sales over time
+    st.subheader("Sales Over Time")
+    col1, col2 = st.columns(2)
+    with col1:
+        granularity = st.selectbox("Period:", ["day", "week", "hour"])
+    with col2:
+        categories = get_categories()
+        category_options = ["All"] + [c['name'] for c in categories]
+        selected_category = st.selectbox("Category:", category_options, key="timeseries_category")
+    category_id = None
+    if selected_category != "All":
+        category_id = next(c['id'] for c in categories if c['name'] == selected_category)
+    
+    timeseries = get_sales_timeseries(granularity, category_id)
+    if timeseries.get('series'):
+        st.line_chart(
+            {
+                'bucket': [point['bucket'] for point in timeseries['series']],
+                'revenue': [point['revenue'] for point in timeseries['series']]
+            },
+            x='bucket', y='revenue'
+        )
+    
     # Purchase history
     st.subheader("Purchase History")
     
@@ -338,35 +527,58 @@ def show_analytics_page():
 
 def show_scraping_page():
     st.header("Web Scraping - Price Comparison")
-    st.info("This demonstrates web scraping with simulated data")
+    st.info("Competitor prices are scraped from the configured stores and cached")
     
-    products = get_products()
-    if products:
-        product_names = [p['name'] for p in products]
-        selected_product = st.selectbox("Select product:", product_names)
-        
-        # Find product ID
-        product_id = None
-        for p in products:
-            if p['name'] == selected_product:
-                product_id = p['id']
-                break
+    products = search_products("scraping")
+    if not products:
+        st.info("No products match the search")
+    else:
+        product_ids = {p['name']: p['id'] for p in products}
+        product_id = product_ids[st.selectbox("Select product:", list(product_ids))]
         
         if st.button("Compare Prices"):
             price_data = compare_prices(product_id)
             if price_data:
                 st.subheader(f"Price comparison for: {price_data['product_name']}")
                 
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    st.metric("Our Price", f"€{price_data['our_price']:.2f}")
-                with col2:
-                    st.metric("Store A", f"€{price_data['competitors'][0]['price']:.2f}")
-                with col3:
-                    st.metric("Store B", f"€{price_data['competitors'][1]['price']:.2f}")
+                columns = st.columns(1 + len(price_data['competitors']))
+                columns[0].metric("Our Price", f"€{price_data['our_price']:.2f}")
+                for column, competitor in zip(columns[1:], price_data['competitors']):
+                    if competitor['price'] is None:
+                        column.metric(competitor['store'], "n/a")
+                    else:
+                        column.metric(competitor['store'], f"€{competitor['price']:.2f}")
+                    column.caption(f"Updated {competitor['fetched_at']}")
                 
                 st.info(f"Best price: €{price_data['best_price']:.2f}")
                 st.write(price_data['note'])
+                if price_data.get('refresh_queued'):
+                    st.caption("A price refresh has been queued; compare again in a moment for newer prices")
+        
+        # Whole-cart comparison
+        if st.session_state.current_cart_id:
+            st.subheader(f"Compare Cart #{st.session_state.current_cart_id}")
+            if st.button("Compare Whole Cart"):
+                basket = compare_basket_prices(cart_id=st.session_state.current_cart_id)
+                if basket.get('items'):
+                    columns = st.columns(len(basket['stores']))
+                    for column, store in zip(columns, basket['stores']):
+                        column.metric(store['store'], f"€{store['total']:.2f}")
+                        if not store['complete']:
+                            column.caption(f"{len(store['missing'])} products without a price")
+                    
+                    st.info(f"Cheapest complete basket: {basket['cheapest_store']} (€{basket['cheapest_total']:.2f}). "
+                            f"Buying each product where it is cheapest: €{basket['split_basket_total']:.2f}")
+                    st.dataframe(
+                        [{'Product': item['name'], 'Qty': item['quantity'],
+                          'Cheapest at': item['cheapest_store'], 'Price': item['cheapest_price']}
+                         for item in basket['items']],
+                        use_container_width=True
+                    )
+                    if basket['refresh_queued']:
+                        st.caption("Some prices are being refreshed; compare again in a moment for newer prices")
+                else:
+                    st.info("Cart is empty")
         
         # Frequently bought together
         st.subheader("Frequently Bought Together")
@@ -386,11 +598,18 @@ def show_ai_page():
     # Recipe suggestions
     st.subheader("Recipe Suggestions")
     
-    products = get_products()
-    if products:
+    # The selection is kept apart from the widget, whose state resets whenever a new search changes
+    # its options, and handed back to it before every render
+    products = search_products("recipe")
+    chosen = st.session_state.setdefault("recipe_selection", [])
+    options = list(dict.fromkeys(chosen + [p['name'] for p in products]))
+    if options:
+        st.session_state.recipe_products = chosen
         selected_products = st.multiselect(
             "Select products for recipe:",
-            [p['name'] for p in products]
+            options,
+            key="recipe_products",
+            on_change=lambda: st.session_state.update(recipe_selection=st.session_state.recipe_products)
         )
         
         if st.button("Get Recipe Suggestion"):
@@ -398,6 +617,9 @@ def show_ai_page():
             if recipe_data:
                 st.success("Recipe Suggestion:")
                 st.write(recipe_data['recipe_suggestion'])
+                for recipe in recipe_data.get('recipes', [])[1:]:
+                    missing = f" (also needs: {', '.join(recipe['missing'])})" if recipe['missing'] else ""
+                    st.write(f"- **{recipe['name']}** - {recipe['score']:.0%} of ingredients{missing}")
                 st.info(recipe_data['note'])
     
     # Nutrition analysis
@@ -410,6 +632,11 @@ def show_ai_page():
                 st.success("Nutritional Analysis:")
                 st.write(nutrition_data['nutrition_analysis'])
                 
+                if nutrition_data.get('totals'):
+                    columns = st.columns(len(nutrition_data['totals']))
+                    for column, (nutrient, amount) in zip(columns, nutrition_data['totals'].items()):
+                        column.metric(nutrient.capitalize(), f"{amount:.0f}" + ("" if nutrient == 'kcal' else " g"))
+                
                 if nutrition_data['categories']:
                     st.subheader("Product Categories in Cart:")
                     for category, count in nutrition_data['categories'].items():